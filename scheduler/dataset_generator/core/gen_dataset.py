@@ -36,6 +36,9 @@ def generate_dataset(
     vms = generate_vms(vm_count, max_memory_gb, min_cpu_speed_mips, max_cpu_speed_mips, vm_rng)
     allocate_vms(vms, hosts, vm_rng)
 
+    # Make sure that the problem is feasible (no task requires more memory than the largest VM)
+    max_req_memory_mb = max(vm.memory_mb for vm in vms)
+
     workflows = generate_workflows(
         workflow_count=workflow_count,
         dag_method=dag_method,
@@ -44,8 +47,7 @@ def generate_dataset(
         task_length_dist=task_length_dist,
         min_task_length=min_task_length,
         max_task_length=max_task_length,
-        # Make sure that the problem is feasible
-        max_req_memory_mb=max(vm.memory_mb for vm in vms),
+        max_req_memory_mb=max_req_memory_mb,
         task_arrival=task_arrival,
         arrival_rate=arrival_rate,
         rng=rng,
@@ -85,11 +85,12 @@ def generate_dag_gnp(n: int, p: float | None, rng: np.random.RandomState) -> dic
     nodes: dict[int, set[int]] = {i: set() for i in range(n)}
     start_nodes: set[int] = set(range(1, n))
 
-    for i in range(1, n):
-        for j in range(i + 1, n):
-            if rng.random() < p:
-                nodes[i].add(j)
-                start_nodes.discard(j)
+    # Edge (i, j) for every 0 < i < j < n is drawn in the same order as a nested loop would, but in one call
+    edge_i, edge_j = np.triu_indices(n - 1, k=1)
+    has_edge = rng.random(len(edge_i)) < p
+    for i, j in zip((edge_i[has_edge] + 1).tolist(), (edge_j[has_edge] + 1).tolist()):
+        nodes[i].add(j)
+        start_nodes.discard(j)
 
     for i in start_nodes:
         nodes[0].add(i)
@@ -1,6 +1,8 @@
 import dataclasses
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class Task:
@@ -54,6 +56,18 @@ class VmAssignment:
     start_time: float
     end_time: float
 
+    @staticmethod
+    def to_arrays(vm_assignments: list["VmAssignment"]) -> dict[str, np.ndarray]:
+        """Convert the assignments to parallel arrays (one array per field)."""
+        count = len(vm_assignments)
+        return {
+            "workflow_id": np.fromiter((a.workflow_id for a in vm_assignments), dtype=np.int64, count=count),
+            "task_id": np.fromiter((a.task_id for a in vm_assignments), dtype=np.int64, count=count),
+            "vm_id": np.fromiter((a.vm_id for a in vm_assignments), dtype=np.int64, count=count),
+            "start_time": np.fromiter((a.start_time for a in vm_assignments), dtype=np.float64, count=count),
+            "end_time": np.fromiter((a.end_time for a in vm_assignments), dtype=np.float64, count=count),
+        }
+
 
 @dataclass
 class Dataset:
@@ -82,6 +96,9 @@ class Solution:
         # noinspection PyTypeChecker
         return dataclasses.asdict(self)
 
+    def vm_assignment_arrays(self) -> dict[str, np.ndarray]:
+        return VmAssignment.to_arrays(self.vm_assignments)
+
     @staticmethod
     def from_json(data: dict) -> "Solution":
         dataset = Dataset.from_json(data.pop("dataset"))
@@ -5,16 +5,18 @@ import networkx as nx
 import numpy as np
 import pygraphviz as pgv
 
-from scheduler.dataset_generator.core.models import Workflow, VmAssignment, Vm
+from scheduler.dataset_generator.core.models import Task, Workflow, VmAssignment, Vm
 
 
 # Helper functions
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+COLOR_MAP = ["#FADFA1", "#7EACB5", "#E6B9A6", "#939185", "#FFF078", "#939185"]
+
+
 def get_color(color_id: int) -> str:
-    color_map = ["#FADFA1", "#7EACB5", "#E6B9A6", "#939185", "#FFF078", "#939185"]
-    return color_map[color_id % len(color_map)]
+    return COLOR_MAP[color_id % len(COLOR_MAP)]
 
 
 def get_node_id(workflow_id: int, task_id: int) -> str:
@@ -97,34 +99,48 @@ def plot_execution_graph(g: nx.DiGraph, workflows: list[Workflow], vms: list[Vm]
 
 
 def plot_gantt_chart(ax: plt.Axes, workflows: list[Workflow], vms: list[Vm], result: list[VmAssignment], label=True):
-    result_map: dict[tuple[int, int], VmAssignment] = {
-        (assignment.workflow_id, assignment.task_id): assignment for assignment in result
+    task_map: dict[tuple[int, int], Task] = {
+        (workflow.id, task.id): task for workflow in workflows for task in workflow.tasks
     }
 
-    for workflow in workflows:
-        for task in workflow.tasks:
-            if (workflow.id, task.id) not in result_map:
-                continue
-
-            assigned_task = result_map[(workflow.id, task.id)]
-            if assigned_task.end_time < 0:
-                continue
-
-            ax.broken_barh(
-                [(assigned_task.start_time, assigned_task.end_time - assigned_task.start_time)],
-                (int(assigned_task.vm_id) - 0.3, 0.6),
-                color=get_color(workflow.id),
-                edgecolor="black",
-                linewidth=0.5,
+    # Only the finished assignments of known tasks are drawn (last assignment wins if a task is assigned twice)
+    result_map: dict[tuple[int, int], VmAssignment] = {
+        (assignment.workflow_id, assignment.task_id): assignment
+        for assignment in result
+        if (assignment.workflow_id, assignment.task_id) in task_map
+    }
+    assignments = VmAssignment.to_arrays([a for a in result_map.values() if a.end_time >= 0])
+    durations = assignments["end_time"] - assignments["start_time"]
+
+    # Bars of each VM are drawn in a single call
+    order = np.argsort(assignments["vm_id"], kind="stable")
+    vm_ids, vm_starts = np.unique(assignments["vm_id"][order], return_index=True)
+    for vm_id, vm_order in zip(vm_ids, np.split(order, vm_starts[1:])):
+        ax.broken_barh(
+            list(zip(assignments["start_time"][vm_order], durations[vm_order])),
+            (int(vm_id) - 0.3, 0.6),
+            facecolors=[get_color(workflow_id) for workflow_id in assignments["workflow_id"][vm_order]],
+            edgecolor="black",
+            linewidth=0.5,
+        )
+
+    if label:
+        # Arrays are converted to lists once (indexing numpy arrays element by element is slow)
+        for workflow_id, task_id, vm_id, center, duration in zip(
+            assignments["workflow_id"].tolist(),
+            assignments["task_id"].tolist(),
+            assignments["vm_id"].tolist(),
+            (assignments["start_time"] + durations / 2).tolist(),
+            durations.tolist(),
+        ):
+            task = task_map[(workflow_id, task_id)]
+            ax.text(
+                x=center,
+                y=vm_id,
+                s=f"W{workflow_id} T{task_id} ({duration:.0f}s)\n{task.length}MI {task.req_memory_mb // 1024}GB",
+                ha="center",
+                va="center",
             )
-            if label:
-                ax.text(
-                    x=assigned_task.start_time + (assigned_task.end_time - assigned_task.start_time) / 2,
-                    y=int(assigned_task.vm_id),
-                    s=f"W{workflow.id} T{task.id} ({assigned_task.end_time - assigned_task.start_time:.0f}s)\n{task.length}MI {task.req_memory_mb // 1024}GB",
-                    ha="center",
-                    va="center",
-                )
 
     ax.set_yticks(range(len(vms)))
     ax.set_yticklabels([f"VM {vm.id}\n{int(vm.cpu_speed_mips)}MIPS {vm.memory_mb // 1024}GB" for vm in vms])
@@ -28,7 +28,6 @@ def main(args: Args):
     solution = Solution.from_json(dataset_dict)
 
     # Workflow graph
-    _, ax = plt.subplots()
     g_w: nx.DiGraph = nx.DiGraph()
     a_w = plot_workflow_graphs(g_w, solution.dataset.workflows)
     save_agraph(a_w, f"{args.prefix}_workflows.png")
@@ -37,15 +36,15 @@ def main(args: Args):
     print_solution(solution.dataset.workflows, solution.vm_assignments)
 
     # Execution graph
-    _, ax = plt.subplots()
     g_e: nx.DiGraph = nx.DiGraph()
     a_e = plot_execution_graph(g_e, solution.dataset.workflows, solution.dataset.vms, solution.vm_assignments)
     save_agraph(a_e, f"{args.prefix}_execution.png", dir_lr=True)
 
-    # Gantt chart
-    _, ax = plt.subplots()
+    # Gantt chart (only this chart is drawn with matplotlib, graphs are rendered with graphviz)
+    fig, ax = plt.subplots()
     plot_gantt_chart(ax, solution.dataset.workflows, solution.dataset.vms, solution.vm_assignments, label=False)
-    plt.savefig(f"{args.prefix}_gantt.png")
+    fig.savefig(f"{args.prefix}_gantt.png")
+    plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -15,6 +15,16 @@ class Agent(nn.Module, abc.ABC):
         """
         raise NotImplementedError()
 
+    def get_action(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Gets the action of a given state (without computing the value).
+
+        :param x: (batch_size, N)
+        :return chosen_actions: (batch_size,)
+        """
+        chosen_actions, _, _, _ = self.get_action_and_value(x)
+        return chosen_actions
+
     def get_action_and_value(
         self, x: torch.Tensor, action: Optional[torch.Tensor] = None
     ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
@@ -1,9 +1,7 @@
 from typing import Optional, Tuple
 import torch
 import torch.nn as nn
-
-from torch.distributions.categorical import Categorical
-from torch.nn.functional import softmax
+import torch.nn.functional as F
 
 from torch_geometric.nn.models import GIN
 from torch_geometric.nn.glob import global_mean_pool
@@ -13,6 +11,58 @@ from scheduler.rl_model.agents.agent import Agent
 from scheduler.rl_model.agents.gin_agent.mapper import GinAgentMapper, GinAgentObsTensor
 
 
+# Graph Batch Norm
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class GraphBatchNorm(nn.BatchNorm1d):
+    """
+    Batch norm that normalizes the rows of each graph in a batch of disjoint graphs separately.
+    In training mode, outputs of a graph do not depend on the other graphs in the batch (same as a batch of one graph),
+    running stats are updated as if the graphs were passed one after another (so saved models stay compatible).
+    Calling the module directly applies the usual batch norm over all rows.
+    """
+
+    def forward_graphs(self, x: torch.Tensor, batch: torch.Tensor, num_graphs: int) -> torch.Tensor:
+        if not (self.training or self.running_mean is None):
+            return self(x)
+
+        # Per graph mean and (biased) variance of each feature
+        counts = torch.bincount(batch, minlength=num_graphs).to(x.dtype).unsqueeze(-1)
+        mean = x.new_zeros(num_graphs, x.shape[1]).index_add_(0, batch, x) / counts.clamp(min=1)
+        centered = x - mean[batch]
+        var = x.new_zeros(num_graphs, x.shape[1]).index_add_(0, batch, centered * centered) / counts.clamp(min=1)
+        out = centered / torch.sqrt(var[batch] + self.eps)
+        if self.affine:
+            out = out * self.weight + self.bias
+
+        if self.training and self.track_running_stats and self.running_mean is not None:
+            assert self.running_var is not None and self.num_batches_tracked is not None
+            assert self.momentum is not None, "Cumulative moving average is not supported"
+            with torch.no_grad():
+                # Sequential updates r <- (1 - m) r + m s_i over graphs i = 0..G-1 in closed form
+                decay = (1 - self.momentum) ** torch.arange(num_graphs - 1, -1, -1, device=x.device, dtype=x.dtype)
+                unbiased_var = var * counts / (counts - 1).clamp(min=1)
+                self.running_mean.mul_((1 - self.momentum) ** num_graphs).add_(
+                    self.momentum * (decay.unsqueeze(-1) * mean).sum(dim=0)
+                )
+                self.running_var.mul_((1 - self.momentum) ** num_graphs).add_(
+                    self.momentum * (decay.unsqueeze(-1) * unbiased_var).sum(dim=0)
+                )
+                self.num_batches_tracked.add_(num_graphs)
+
+        return out
+
+
+class GraphSequential(nn.Sequential):
+    """Sequential model that passes the graph index of each row to the graph batch norm layers."""
+
+    def forward_graphs(self, x: torch.Tensor, batch: torch.Tensor, num_graphs: int) -> torch.Tensor:
+        for module in self:
+            x = module.forward_graphs(x, batch, num_graphs) if isinstance(module, GraphBatchNorm) else module(x)
+        return x
+
+
 # Base Gin Network
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -23,21 +73,21 @@ class BaseGinNetwork(nn.Module):
         self.embedding_dim = embedding_dim
         self.device = device
 
-        self.task_encoder = nn.Sequential(
+        self.task_encoder = GraphSequential(
             nn.Linear(4, hidden_dim),
-            nn.BatchNorm1d(hidden_dim),
+            GraphBatchNorm(hidden_dim),
             nn.ReLU(),
             nn.Linear(hidden_dim, hidden_dim),
-            nn.BatchNorm1d(hidden_dim),
+            GraphBatchNorm(hidden_dim),
             nn.ReLU(),
             nn.Linear(hidden_dim, embedding_dim),
         ).to(self.device)
-        self.vm_encoder = nn.Sequential(
+        self.vm_encoder = GraphSequential(
             nn.Linear(3, hidden_dim),
-            nn.BatchNorm1d(hidden_dim),
+            GraphBatchNorm(hidden_dim),
             nn.ReLU(),
             nn.Linear(hidden_dim, hidden_dim),
-            nn.BatchNorm1d(hidden_dim),
+            GraphBatchNorm(hidden_dim),
             nn.ReLU(),
             nn.Linear(hidden_dim, embedding_dim),
         ).to(self.device)
@@ -53,32 +103,31 @@ class BaseGinNetwork(nn.Module):
 
     def forward(self, obs: GinAgentObsTensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         num_tasks = obs.task_state_scheduled.shape[0]
-        num_vms = obs.vm_completion_time.shape[0]
+        num_graphs = obs.graph_task_counts.shape[0]
 
         task_features = [obs.task_state_scheduled, obs.task_state_ready, obs.task_length, obs.task_completion_time]
         vm_features = [obs.vm_completion_time, 1 / (obs.vm_speed + 1e-8), obs.vm_energy_rate]
 
         # Encode tasks
         task_x = torch.stack(task_features, dim=-1)
-        task_h: torch.Tensor = self.task_encoder(task_x)
+        task_h: torch.Tensor = self.task_encoder.forward_graphs(task_x, obs.task_batch, num_graphs)
 
         # Encode VMs
         vm_x = torch.stack(vm_features, dim=-1)
-        vm_h: torch.Tensor = self.vm_encoder(vm_x)
+        vm_h: torch.Tensor = self.vm_encoder.forward_graphs(vm_x, obs.vm_batch, num_graphs)
 
         # Structuring nodes as [0, 1, ..., T-1] [T, T+1, ..., T+VM-1], edges are between Tasks -> Compatible VMs
-        task_vm_edges = obs.compatibilities.clone()
-        task_vm_edges[1] = task_vm_edges[1] + num_tasks  # Reindex VMs
+        task_vm_edges = torch.stack([obs.compatibilities[0], obs.compatibilities[1] + num_tasks])  # Reindex VMs
 
         # Get features
         node_x = torch.cat([task_h, vm_h])
         edge_index = torch.cat([task_vm_edges, obs.task_dependencies], dim=-1)
 
-        # Get embeddings
-        batch = torch.zeros(num_tasks + num_vms, dtype=torch.long, device=self.device)
+        # Get embeddings (one graph embedding per observation graph in the batch)
+        batch = torch.cat([obs.task_batch, obs.vm_batch])
         node_embeddings = self.graph_network(node_x, edge_index=edge_index)
         edge_embeddings = torch.cat([node_embeddings[edge_index[0]], node_embeddings[edge_index[1]]], dim=1)
-        graph_embedding = global_mean_pool(node_embeddings, batch=batch)
+        graph_embedding = global_mean_pool(node_embeddings, batch=batch, size=num_graphs)
 
         return node_embeddings, edge_embeddings, graph_embedding
 
@@ -98,12 +147,12 @@ class GinActor(nn.Module):
             embedding_dim=embedding_dim,
             device=device,
         )
-        self.edge_scorer = nn.Sequential(
+        self.edge_scorer = GraphSequential(
             nn.Linear(3 * embedding_dim, 2 * hidden_dim),
-            nn.BatchNorm1d(2 * hidden_dim),
+            GraphBatchNorm(2 * hidden_dim),
             nn.ReLU(),
             nn.Linear(2 * hidden_dim, hidden_dim),
-            nn.BatchNorm1d(hidden_dim),
+            GraphBatchNorm(hidden_dim),
             nn.ReLU(),
             nn.Linear(hidden_dim, 1),
         ).to(self.device)
@@ -112,24 +161,36 @@ class GinActor(nn.Module):
         return super().__call__(*args, **kwargs)
 
     def forward(self, obs: GinAgentObsTensor) -> torch.Tensor:
-        num_tasks = obs.task_completion_time.shape[0]
-        num_vms = obs.vm_completion_time.shape[0]
+        num_graphs = obs.graph_task_counts.shape[0]
+        num_actions = int((obs.graph_task_counts * obs.graph_vm_counts).max().item())
 
         _, edge_embeddings, graph_embedding = self.network(obs)
 
-        # Get edge embedding scores
-        rep_graph_embedding = graph_embedding.expand(edge_embeddings.shape[0], self.embedding_dim)
-        edge_embeddings = torch.cat([edge_embeddings, rep_graph_embedding], dim=1)
-        edge_embedding_scores: torch.Tensor = self.edge_scorer(edge_embeddings)
+        # Get edge embedding scores (each edge is scored along with the embedding of its graph)
+        edge_graph_ids = torch.cat([obs.task_batch[obs.compatibilities[0]], obs.task_batch[obs.task_dependencies[0]]])
+        edge_embeddings = torch.cat([edge_embeddings, graph_embedding[edge_graph_ids]], dim=1)
+        edge_embedding_scores: torch.Tensor = self.edge_scorer.forward_graphs(
+            edge_embeddings, edge_graph_ids, num_graphs
+        )
 
         # Extract the exact edges
         task_vm_edge_scores = edge_embedding_scores.flatten()
         task_vm_edge_scores = task_vm_edge_scores[: obs.compatibilities.shape[1]]
 
-        # Actions scores should be the value in edge embedding, but -inf on invalid actions
-        action_scores = torch.ones((num_tasks, num_vms), dtype=torch.float32).to(self.device) * -1e8
-        action_scores[obs.compatibilities[0], obs.compatibilities[1]] = task_vm_edge_scores
-        action_scores[obs.task_state_ready == 0, :] = -1e8  # Remove scores of actions with not ready tasks
+        # Action of a graph is (task_id * num_vms + vm_id) using the task/VM ids local to the graph
+        task_ids, vm_ids = obs.compatibilities
+        task_vm_graph_ids = edge_graph_ids[: obs.compatibilities.shape[1]]
+        graph_task_offsets = torch.cumsum(obs.graph_task_counts, dim=0) - obs.graph_task_counts
+        graph_vm_offsets = torch.cumsum(obs.graph_vm_counts, dim=0) - obs.graph_vm_counts
+        local_task_ids = task_ids - graph_task_offsets[task_vm_graph_ids]
+        local_vm_ids = vm_ids - graph_vm_offsets[task_vm_graph_ids]
+        action_ids = local_task_ids * obs.graph_vm_counts[task_vm_graph_ids] + local_vm_ids
+
+        # Actions scores are the edge scores of ready tasks, lowest finite value on invalid and padding actions
+        ready_ids = torch.nonzero(obs.task_state_ready[task_ids] != 0).flatten()
+        min_score = torch.finfo(task_vm_edge_scores.dtype).min
+        action_scores = task_vm_edge_scores.new_full((num_graphs, num_actions), min_score)
+        action_scores[task_vm_graph_ids[ready_ids], action_ids[ready_ids]] = task_vm_edge_scores[ready_ids]
 
         return action_scores
 
@@ -160,9 +221,9 @@ class GinCritic(nn.Module):
         return super().__call__(*args, **kwargs)
 
     def forward(self, obs: GinAgentObsTensor) -> torch.Tensor:
-        # Critic value is derived from global graph state
+        # Critic value is derived from global graph state (one value per graph)
         _, _, graph_embedding = self.network(obs)
-        return self.graph_scorer(graph_embedding.unsqueeze(0))
+        return self.graph_scorer(graph_embedding)
 
 
 # Gin Agent
@@ -180,41 +241,38 @@ class GinAgent(Agent, nn.Module):
 
     def get_value(self, x: torch.Tensor) -> torch.Tensor:
         x = x.to(self.device)
-        batch_size = x.shape[0]
-        values = []
+        decoded_obs = self.mapper.unmap_batch(x)
+        return self.critic(decoded_obs).flatten()
 
-        for batch_index in range(batch_size):
-            decoded_obs = self.mapper.unmap(x[batch_index])
-            value = self.critic(decoded_obs)
-            values.append(value)
+    def get_action(self, x: torch.Tensor) -> torch.Tensor:
+        x = x.to(self.device)
 
-        return torch.stack(values).to(self.device)
+        # Only the actor is needed to choose an action, critic is skipped
+        decoded_obs = self.mapper.unmap_batch(x)
+        action_scores = self.actor(decoded_obs)
+        return self.sample_actions(F.log_softmax(action_scores, dim=-1))
 
     def get_action_and_value(
         self, x: torch.Tensor, action: Optional[torch.Tensor] = None
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
         x = x.to(self.device)
-        batch_size = x.shape[0]
-        all_chosen_actions, all_log_probs, all_entropies, all_values = [], [], [], []
-
-        for batch_index in range(batch_size):
-            decoded_obs = self.mapper.unmap(x[batch_index])
-            action_scores = self.actor(decoded_obs)
-            action_scores = action_scores.flatten()
-            action_probabilities = softmax(action_scores, dim=0)
 
-            probs = Categorical(action_probabilities)
-            chosen_action = action[batch_index] if action is not None else probs.sample()
-            value = self.critic(decoded_obs)
+        # Score the actions of all observations at once (batch_size, max_actions)
+        # Scores are used as logits directly, invalid actions have lowest finite logits (zero probability)
+        decoded_obs = self.mapper.unmap_batch(x)
+        action_scores = self.actor(decoded_obs)
 
-            all_chosen_actions.append(chosen_action)
-            all_log_probs.append(probs.log_prob(chosen_action))
-            all_entropies.append(probs.entropy())
-            all_values.append(value)
-
-        chosen_actions = torch.stack(all_chosen_actions).to(self.device)
-        log_probs = torch.stack(all_log_probs).to(self.device)
-        entropies = torch.stack(all_entropies).to(self.device)
-        values = torch.stack(all_values).to(self.device)
+        # Log probabilities are computed once and reused for sampling, log prob of the action and the entropy
+        all_log_probs = F.log_softmax(action_scores, dim=-1)
+        chosen_actions = action if action is not None else self.sample_actions(all_log_probs)
+        log_probs = all_log_probs.gather(-1, chosen_actions.long().unsqueeze(-1)).squeeze(-1)
+        entropies = -(all_log_probs.exp() * all_log_probs).sum(dim=-1)
+        values = self.critic(decoded_obs).flatten()
 
         return chosen_actions, log_probs, entropies, values
+
+    @staticmethod
+    def sample_actions(all_log_probs: torch.Tensor) -> torch.Tensor:
+        """Sample an action for each row of log probabilities (batch_size, max_actions) using the Gumbel-max trick."""
+        gumbel_noise = -torch.log(-torch.log(torch.rand_like(all_log_probs)))
+        return torch.argmax(all_log_probs + gumbel_noise, dim=-1)
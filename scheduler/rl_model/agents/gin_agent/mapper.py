@@ -25,58 +25,134 @@ class GinAgentMapper:
         num_task_deps = task_dependencies.shape[1]
         num_compatibilities = compatibilities.shape[1]
 
-        arr = np.concatenate(
-            [
-                np.array([num_tasks, num_vms, num_task_deps, num_compatibilities], dtype=np.int32),  # Header
-                np.array(task_state_scheduled, dtype=np.int32),  # num_tasks
-                np.array(task_state_ready, dtype=np.int32),  # num_tasks
-                np.array(task_length, dtype=np.float64),  # num_tasks
-                np.array(task_completion_time, dtype=np.float64),  # num_tasks
-                np.array(vm_speed, dtype=np.float64),  # num_vms
-                np.array(vm_energy_rate, dtype=np.float64),  # num_vms
-                np.array(vm_completion_time, dtype=np.float64),  # num_vms
-                np.array(task_dependencies.flatten(), dtype=np.int32),  # num_task_deps*2
-                np.array(compatibilities.flatten(), dtype=np.int32),  # num_compatibilities*2
-            ]
-        )
-
-        assert len(arr) <= self.obs_size, "Observation size does not fit the buffer, please adjust the size of mapper"
-        arr = np.pad(arr, (0, self.obs_size - len(arr)), "constant")
+        # Fields are written one after another into the zero padded float32 output
+        fields = [
+            np.array([num_tasks, num_vms, num_task_deps, num_compatibilities]),  # Header
+            task_state_scheduled,  # num_tasks
+            task_state_ready,  # num_tasks
+            task_length,  # num_tasks
+            task_completion_time,  # num_tasks
+            vm_speed,  # num_vms
+            vm_energy_rate,  # num_vms
+            vm_completion_time,  # num_vms
+            task_dependencies.ravel(),  # num_task_deps*2
+            compatibilities.ravel(),  # num_compatibilities*2
+        ]
+        total_size = 4 + 4 * num_tasks + 3 * num_vms + 2 * num_task_deps + 2 * num_compatibilities
+        assert total_size <= self.obs_size, "Observation size does not fit the buffer, please adjust the size of mapper"
+
+        arr = np.zeros(self.obs_size, dtype=np.float32)
+        field_start = 0
+        for field in fields:
+            arr[field_start : field_start + len(field)] = field
+            field_start += len(field)
 
         return arr
 
     def unmap(self, tensor: torch.Tensor) -> "GinAgentObsTensor":
         assert len(tensor) == self.obs_size, "Tensor size is not of expected size"
 
-        num_tasks = int(tensor[0].long().item())
-        num_vms = int(tensor[1].long().item())
-        num_task_deps = int(tensor[2].long().item())
-        num_compatibilities = int(tensor[3].long().item())
-        tensor = tensor[4:]
-
-        task_state_scheduled = tensor[:num_tasks].long()
-        tensor = tensor[num_tasks:]
-        task_state_ready = tensor[:num_tasks].long()
-        tensor = tensor[num_tasks:]
-        task_length = tensor[:num_tasks]
-        tensor = tensor[num_tasks:]
-        task_completion_time = tensor[:num_tasks]
-        tensor = tensor[num_tasks:]
-
-        vm_speed = tensor[:num_vms]
-        tensor = tensor[num_vms:]
-        vm_energy_rate = tensor[:num_vms]
-        tensor = tensor[num_vms:]
-        vm_completion_time = tensor[:num_vms]
-        tensor = tensor[num_vms:]
-
-        task_dependencies = tensor[: num_task_deps * 2].reshape(2, num_task_deps).long()
-        tensor = tensor[num_task_deps * 2 :]
-        compatibilities = tensor[: num_compatibilities * 2].reshape(2, num_compatibilities).long()
-        tensor = tensor[num_compatibilities * 2 :]
+        # Header is read with a single device to host copy
+        num_tasks, num_vms, num_task_deps, num_compatibilities = tensor[:4].long().tolist()
+        field_sizes = [num_tasks] * 4 + [num_vms] * 3 + [num_task_deps * 2, num_compatibilities * 2]
+        (
+            task_state_scheduled,
+            task_state_ready,
+            task_length,
+            task_completion_time,
+            vm_speed,
+            vm_energy_rate,
+            vm_completion_time,
+            task_dependencies,
+            compatibilities,
+            tensor,
+        ) = torch.split(tensor[4:], field_sizes + [len(tensor) - 4 - sum(field_sizes)])
+
+        task_state_scheduled = task_state_scheduled.long()
+        task_state_ready = task_state_ready.long()
+        task_dependencies = task_dependencies.reshape(2, num_task_deps).long()
+        compatibilities = compatibilities.reshape(2, num_compatibilities).long()
 
         assert not tensor.any(), "There are non-zero elements in the padding"
 
+        device = tensor.device
+        return GinAgentObsTensor(
+            task_state_scheduled=task_state_scheduled,
+            task_state_ready=task_state_ready,
+            task_length=task_length,
+            task_completion_time=task_completion_time,
+            vm_speed=vm_speed,
+            vm_energy_rate=vm_energy_rate,
+            vm_completion_time=vm_completion_time,
+            task_dependencies=task_dependencies,
+            compatibilities=compatibilities,
+            task_batch=torch.zeros(num_tasks, dtype=torch.long, device=device),
+            vm_batch=torch.zeros(num_vms, dtype=torch.long, device=device),
+            graph_task_counts=torch.tensor([num_tasks], dtype=torch.long, device=device),
+            graph_vm_counts=torch.tensor([num_vms], dtype=torch.long, device=device),
+        )
+
+    def unmap_batch(self, tensor: torch.Tensor) -> "GinAgentObsTensor":
+        """Unmap a batch of observations (batch_size, N) as a single graph made of disjoint observation graphs."""
+        batch_size, obs_size = tensor.shape
+        assert obs_size == self.obs_size, "Tensor size is not of expected size"
+        if batch_size == 1:
+            # Single observation (online scheduling) is decoded with plain slices, far fewer ops than gathering
+            return self.unmap(tensor[0])
+
+        device = tensor.device
+        flat_tensor = tensor.flatten()
+
+        # Number of tasks/VMs/dependencies/compatibilities of each observation (batch_size,)
+        headers = tensor[:, :4].long()
+        num_tasks, num_vms, num_task_deps, num_compatibilities = headers.unbind(dim=1)
+        total_tasks, total_vms, total_task_deps, total_compatibilities = headers.sum(dim=0).tolist()
+
+        # Start of each field of each observation in the flattened batch (fields are laid out as in map)
+        field_start = torch.arange(batch_size, device=device) * obs_size + 4
+
+        def take(length: torch.Tensor, total: int) -> torch.Tensor:
+            """Take the next field (with given length in each observation) of all observations, concatenated."""
+            nonlocal field_start
+            # Index of j-th value of i-th observation = field_start[i] + j, so shift global positions by the offsets
+            shifts = field_start - (torch.cumsum(length, dim=0) - length)
+            indices = torch.arange(total, device=device) + torch.repeat_interleave(shifts, length, output_size=total)
+            field_start = field_start + length
+            return flat_tensor[indices]
+
+        task_state_scheduled = take(num_tasks, total_tasks).long()
+        task_state_ready = take(num_tasks, total_tasks).long()
+        task_length = take(num_tasks, total_tasks)
+        task_completion_time = take(num_tasks, total_tasks)
+
+        vm_speed = take(num_vms, total_vms)
+        vm_energy_rate = take(num_vms, total_vms)
+        vm_completion_time = take(num_vms, total_vms)
+
+        # Reindex the edges so that the nodes of each observation graph follow the nodes of the previous graphs
+        task_offsets = torch.cumsum(num_tasks, dim=0) - num_tasks
+        vm_offsets = torch.cumsum(num_vms, dim=0) - num_vms
+        dep_task_offsets = torch.repeat_interleave(task_offsets, num_task_deps, output_size=total_task_deps)
+        task_dependencies = torch.stack(
+            [
+                take(num_task_deps, total_task_deps).long() + dep_task_offsets,
+                take(num_task_deps, total_task_deps).long() + dep_task_offsets,
+            ]
+        )
+        compatibilities = torch.stack(
+            [
+                take(num_compatibilities, total_compatibilities).long()
+                + torch.repeat_interleave(task_offsets, num_compatibilities, output_size=total_compatibilities),
+                take(num_compatibilities, total_compatibilities).long()
+                + torch.repeat_interleave(vm_offsets, num_compatibilities, output_size=total_compatibilities),
+            ]
+        )
+
+        padding_start = field_start - torch.arange(batch_size, device=device) * obs_size
+        padding = torch.arange(obs_size, device=device) >= padding_start[:, None]
+        assert not (tensor[padding] != 0).any(), "There are non-zero elements in the padding"
+
+        graph_ids = torch.arange(batch_size, device=device)
         return GinAgentObsTensor(
             task_state_scheduled=task_state_scheduled,
             task_state_ready=task_state_ready,
@@ -87,6 +163,10 @@ class GinAgentMapper:
             vm_completion_time=vm_completion_time,
             task_dependencies=task_dependencies,
             compatibilities=compatibilities,
+            task_batch=torch.repeat_interleave(graph_ids, num_tasks, output_size=total_tasks),
+            vm_batch=torch.repeat_interleave(graph_ids, num_vms, output_size=total_vms),
+            graph_task_counts=num_tasks,
+            graph_vm_counts=num_vms,
         )
 
 
@@ -101,3 +181,8 @@ class GinAgentObsTensor:
     vm_completion_time: torch.Tensor
     task_dependencies: torch.Tensor
     compatibilities: torch.Tensor
+    # Graph (observation) index of each task/VM and the number of tasks/VMs in each graph
+    task_batch: torch.Tensor
+    vm_batch: torch.Tensor
+    graph_task_counts: torch.Tensor
+    graph_vm_counts: torch.Tensor
@@ -1,4 +1,4 @@
-from typing import SupportsFloat, Any
+from typing import SupportsFloat, Any, cast
 
 import numpy as np
 import gymnasium as gym
@@ -17,6 +17,13 @@ class GinAgentWrapper(gym.Wrapper):
     prev_obs: EnvObservation
     initial_obs: EnvObservation
 
+    # Static (per episode) observation arrays
+    task_length: np.ndarray
+    vm_speed: np.ndarray
+    vm_energy_rate: np.ndarray
+    compatibilities: np.ndarray
+    vm_count: int
+
     def __init__(self, env: gym.Env[np.ndarray, int]):
         super().__init__(env)
         self.mapper = GinAgentMapper(MAX_OBS_SIZE)
@@ -26,6 +33,13 @@ class GinAgentWrapper(gym.Wrapper):
     ) -> tuple[np.ndarray, dict[str, Any]]:
         obs, info = super().reset(seed=seed, options=options)
         assert isinstance(obs, EnvObservation)
+
+        # Task lengths, VMs and compatibilities do not change during an episode, so they are mapped once
+        self.task_length = np.array([task.length for task in obs.task_observations])
+        self.vm_speed = np.array([vm.cpu_speed_mips for vm in obs.vm_observations])
+        self.vm_energy_rate = np.array([active_energy_consumption_per_mi(vm) for vm in obs.vm_observations])
+        self.compatibilities = np.array(obs.compatibilities).T
+        self.vm_count = len(obs.vm_observations)
         mapped_obs = self.map_observation(obs)
 
         self.prev_obs = obs
@@ -34,38 +48,35 @@ class GinAgentWrapper(gym.Wrapper):
 
     def step(self, action: int) -> tuple[np.ndarray, SupportsFloat, bool, bool, dict[str, Any]]:
         mapped_action = self.map_action(action)
+        # Observation type is checked once in reset (wrapped env does not change), so only the type is narrowed here
         obs, _, terminated, truncated, info = super().step(mapped_action)
-        assert isinstance(obs, EnvObservation)
+        obs = cast(EnvObservation, obs)
         mapped_obs = self.map_observation(obs)
 
-        makespan_reward = -(obs.makespan() - self.prev_obs.makespan()) / obs.makespan()
-        energy_reward = -(obs.energy_consumption() - self.prev_obs.energy_consumption()) / obs.energy_consumption()
+        makespan, prev_makespan = obs.makespan(), self.prev_obs.makespan()
+        energy_consumption, prev_energy_consumption = obs.energy_consumption(), self.prev_obs.energy_consumption()
+        # Denominators are bounded away from zero (e.g. if all remaining tasks have zero length)
+        makespan_reward = -(makespan - prev_makespan) / max(makespan, 1e-8)
+        energy_reward = -(energy_consumption - prev_energy_consumption) / max(energy_consumption, 1e-8)
         reward = makespan_reward + energy_reward
 
         self.prev_obs = obs
         return mapped_obs, reward, terminated, truncated, info
 
     def map_action(self, action: int) -> EnvAction:
-        vm_count = len(self.prev_obs.vm_observations)
-        return EnvAction(task_id=int(action // vm_count), vm_id=int(action % vm_count))
+        # Action may be a numpy integer (vectorized envs), so it is converted once before splitting
+        task_id, vm_id = divmod(int(action), self.vm_count)
+        return EnvAction(task_id=task_id, vm_id=vm_id)
 
     def map_observation(self, observation: EnvObservation) -> np.ndarray:
-        # Task observations
-        task_state_scheduled = np.array([task.assigned_vm_id is not None for task in observation.task_observations])
-        task_state_ready = np.array([task.is_ready for task in observation.task_observations])
-        task_length = np.array([task.length for task in observation.task_observations])
-
-        # VM observations
-        vm_speed = np.array([vm.cpu_speed_mips for vm in observation.vm_observations])
-        vm_energy_rate = np.array([active_energy_consumption_per_mi(vm) for vm in observation.vm_observations])
-        vm_completion_time = np.array([vm.completion_time for vm in observation.vm_observations])
+        # Task/VM states (already arrays in the observation)
+        task_state_scheduled = observation.task_state_scheduled
+        task_state_ready = observation.task_state_ready
+        vm_completion_time = observation.vm_completion_time
 
         # Task-Task observations
         task_dependencies = np.array(observation.task_dependencies).T
 
-        # Task-VM observations
-        compatibilities = np.array(observation.compatibilities).T
-
         # Task completion times
         task_completion_time = observation.task_completion_time()
         assert task_completion_time is not None
@@ -73,11 +84,11 @@ class GinAgentWrapper(gym.Wrapper):
         return self.mapper.map(
             task_state_scheduled=task_state_scheduled,
             task_state_ready=task_state_ready,
-            task_length=task_length,
+            task_length=self.task_length,
             task_completion_time=task_completion_time,
-            vm_speed=vm_speed,
-            vm_energy_rate=vm_energy_rate,
+            vm_speed=self.vm_speed,
+            vm_energy_rate=self.vm_energy_rate,
             vm_completion_time=vm_completion_time,
             task_dependencies=task_dependencies,
-            compatibilities=compatibilities,
+            compatibilities=self.compatibilities,
         )
@@ -3,6 +3,7 @@ import random
 from typing import Any, Callable
 
 import gymnasium as gym
+import numpy as np
 
 from scheduler.config.settings import MAX_TRAINING_DS_SEED
 from scheduler.dataset_generator.core.gen_dataset import generate_dataset
@@ -71,19 +72,30 @@ class CloudSchedulingGymEnvironment(gym.Env):
         task_states[0].assigned_vm_id = 0
         for task_id in mapped_tasks[0].child_ids:
             task_states[task_id].is_ready = True
-        # Create compatibility edges (task, vm)
-        compatibilities = [
-            (task_id, vm_id)
-            for task_id in range(len(mapped_tasks))
-            for vm_id in range(len(vms))
-            if is_suitable(vms[vm_id], mapped_tasks[task_id])
-        ]
+        # Create compatibility edges (task, vm) - same check as is_suitable, but for all pairs at once (in task order)
+        task_req_memory_mb = np.array([task.req_memory_mb for task in mapped_tasks])
+        vm_memory_mb = np.array([vm.memory_mb for vm in vms])
+        compat_task_ids, compat_vm_ids = np.nonzero(vm_memory_mb[None, :] >= task_req_memory_mb[:, None])
+        compatibilities = list(zip(compat_task_ids.tolist(), compat_vm_ids.tolist()))
+        # Compatible VMs of each task (compatibilities are in task order)
+        task_compatible_vm_ids = np.split(compat_vm_ids, np.searchsorted(compat_task_ids, range(1, len(mapped_tasks))))
         # Create dependencies from parent->child relations
         dependencies = set(
             (task_id, child_id)
             for task_id in range(len(mapped_tasks))  #
             for child_id in mapped_tasks[task_id].child_ids
         )
+        task_parent_ids: list[list[int]] = [[] for _ in mapped_tasks]
+        for task_id, child_id in dependencies:
+            task_parent_ids[child_id].append(task_id)
+        # Costs of all task/VM pairs as outer products (computed once, used by the observation estimates)
+        task_lengths = np.array([task.length for task in mapped_tasks])
+        vm_speeds = np.array([vm.cpu_speed_mips for vm in vms])
+        vm_energy_rates = np.array([active_energy_consumption_per_mi(vm) for vm in vms])
+        task_vm_time_cost = task_lengths[:, None] / vm_speeds[None, :]
+        task_vm_energy_cost = task_lengths[:, None] * vm_energy_rates[None, :]
+        task_min_energy_cost = np.ones(len(mapped_tasks)) * 1e8
+        np.minimum.at(task_min_energy_cost, compat_task_ids, task_vm_energy_cost[compat_task_ids, compat_vm_ids])
 
         # Map to the state
         self.state = EnvState(
@@ -92,6 +104,11 @@ class CloudSchedulingGymEnvironment(gym.Env):
                 tasks=mapped_tasks,
                 vms=vms,
                 compatibilities=compatibilities,
+                task_compatible_vm_ids=task_compatible_vm_ids,
+                task_parent_ids=task_parent_ids,
+                task_vm_time_cost=task_vm_time_cost,
+                task_vm_energy_cost=task_vm_energy_cost,
+                task_min_energy_cost=task_min_energy_cost,
             ),
             task_states=task_states,
             vm_states=vm_states,
@@ -117,15 +134,21 @@ class CloudSchedulingGymEnvironment(gym.Env):
         if not is_suitable(self.state.static_state.vms[action.vm_id], self.state.static_state.tasks[action.task_id]):
             return EnvObservation(self.state), penalty, True, False, {"error": f"{action}: Task/VM are not compatible"}
 
-        child_task_ids = [c_id for (p_id, c_id) in self.state.task_dependencies if p_id == action.task_id]
-        parent_task_ids = [p_id for (p_id, c_id) in self.state.task_dependencies if c_id == action.task_id]
+        # Parents and children of an unscheduled task are its workflow dependencies
+        child_task_ids = self.state.static_state.tasks[action.task_id].child_ids
+        parent_task_ids = self.state.static_state.task_parent_ids[action.task_id]
         processing_time = (
             self.state.static_state.tasks[action.task_id].length
             / self.state.static_state.vms[action.vm_id].cpu_speed_mips
         )
 
-        new_task_states = copy.deepcopy(self.state.task_states)
-        new_vm_states = copy.deepcopy(self.state.vm_states)
+        # States are shared with the previous state, only the states that are changed below are copied
+        new_task_states = list(self.state.task_states)
+        new_vm_states = list(self.state.vm_states)
+        for task_id in {action.task_id, *child_task_ids, len(new_task_states) - 1}:
+            new_task_states[task_id] = copy.copy(new_task_states[task_id])
+        for vm_id in {action.vm_id, 0}:
+            new_vm_states[vm_id] = copy.copy(new_vm_states[vm_id])
 
         # Update scheduled states
         new_task_states[action.task_id].assigned_vm_id = action.vm_id
@@ -134,8 +157,7 @@ class CloudSchedulingGymEnvironment(gym.Env):
         new_task_states[action.task_id].is_ready = False
         for child_id in child_task_ids:
             new_task_states[child_id].is_ready = True
-            child_parent_task_ids = [p_id for (p_id, c_id) in self.state.task_dependencies if c_id == child_id]
-            for child_parent_task_id in child_parent_task_ids:
+            for child_parent_task_id in self.state.static_state.task_parent_ids[child_id]:
                 if new_task_states[child_parent_task_id].assigned_vm_id is None:
                     new_task_states[child_id].is_ready = False
                     break
@@ -155,7 +177,7 @@ class CloudSchedulingGymEnvironment(gym.Env):
         )
 
         # New dependencies (a new edge between the old task in the VM and this task)
-        new_task_dependencies = copy.deepcopy(self.state.task_dependencies)
+        new_task_dependencies = set(self.state.task_dependencies)
         vm_prev_task_id = self.state.vm_states[action.vm_id].assigned_task_id or 0
         new_task_dependencies.add((vm_prev_task_id, action.task_id))
 
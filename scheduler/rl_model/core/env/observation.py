@@ -1,4 +1,3 @@
-import copy
 from dataclasses import dataclass
 
 import numpy as np
@@ -12,6 +11,15 @@ class EnvObservation:
     vm_observations: list["VmObservation"]
     task_dependencies: list[tuple[int, int]]
     compatibilities: list[tuple[int, int]]
+    # Task/VM states that change every step as parallel arrays (indexed by task/VM id)
+    task_state_scheduled: np.ndarray
+    task_state_ready: np.ndarray
+    vm_completion_time: np.ndarray
+    # Static task/VM data used by the estimates (shared with the static state, not copied)
+    task_compatible_vm_ids: list[np.ndarray]
+    task_parent_ids: list[list[int]]
+    task_vm_time_cost: np.ndarray
+    task_min_energy_cost: np.ndarray
 
     _makespan: float | None = None
     _energy_consumption: float | None = None
@@ -40,8 +48,23 @@ class EnvObservation:
             )
             for vm_id in range(len(state.vm_states))
         ]
-        self.task_dependencies = copy.deepcopy(list(state.task_dependencies))
-        self.compatibilities = copy.deepcopy(list(state.static_state.compatibilities))
+        num_tasks, num_vms = len(state.task_states), len(state.vm_states)
+        self.task_state_scheduled = np.fromiter(
+            (task.assigned_vm_id is not None for task in state.task_states), dtype=np.bool_, count=num_tasks
+        )
+        self.task_state_ready = np.fromiter(
+            (task.is_ready for task in state.task_states), dtype=np.bool_, count=num_tasks
+        )
+        self.vm_completion_time = np.fromiter(
+            (vm.completion_time for vm in state.vm_states), dtype=np.float64, count=num_vms
+        )
+        # Edges are immutable tuples, so copying the containers is enough
+        self.task_dependencies = list(state.task_dependencies)
+        self.compatibilities = list(state.static_state.compatibilities)
+        self.task_compatible_vm_ids = state.static_state.task_compatible_vm_ids
+        self.task_parent_ids = state.static_state.task_parent_ids
+        self.task_vm_time_cost = state.static_state.task_vm_time_cost
+        self.task_min_energy_cost = state.static_state.task_min_energy_cost
 
     def makespan(self):
         if self._makespan is not None:
@@ -49,6 +72,7 @@ class EnvObservation:
 
         # Calculates the makespan of an observation or and estimate of it if the env is still running
         # Uses max task completion time (task will complete either after parent or after VM completion time)
+        # Unscheduled tasks only have the workflow dependencies as parents
         task_completion_time = np.ones(len(self.task_observations)) * 1e8
         for task_id in range(len(self.task_observations)):
             # Check if already scheduled task
@@ -56,16 +80,16 @@ class EnvObservation:
                 task_completion_time[task_id] = self.task_observations[task_id].completion_time
                 continue
 
-            parent_ids = [pid for pid, cid in self.task_dependencies if cid == task_id]
-            compatible_vm_ids = [vid for tid, vid in self.compatibilities if tid == task_id]
+            parent_ids = self.task_parent_ids[task_id]
+            compatible_vm_ids = self.task_compatible_vm_ids[task_id]
+            if len(compatible_vm_ids) == 0:
+                continue
 
+            # Earliest completion time among all compatible VMs
             parent_comp_time = max(task_completion_time[parent_ids], default=0)
-            for vm_id in compatible_vm_ids:
-                vm_comp_time = self.vm_observations[vm_id].completion_time
-                vm_speed = self.vm_observations[vm_id].cpu_speed_mips
-                task_exec_time = self.task_observations[task_id].length / vm_speed
-                new_comp_time = max(parent_comp_time, vm_comp_time) + task_exec_time
-                task_completion_time[task_id] = min(new_comp_time, task_completion_time[task_id].item())
+            task_exec_times = self.task_vm_time_cost[task_id, compatible_vm_ids]
+            new_comp_times = np.maximum(parent_comp_time, self.vm_completion_time[compatible_vm_ids]) + task_exec_times
+            task_completion_time[task_id] = min(new_comp_times.min().item(), task_completion_time[task_id].item())
 
         self._makespan = task_completion_time[-1].item()
         self._task_completion_time = task_completion_time
@@ -75,22 +99,14 @@ class EnvObservation:
         if self._energy_consumption is not None:
             return self._energy_consumption
 
-        from scheduler.rl_model.core.utils.helpers import active_energy_consumption_per_mi
-
         # Calculates the energy consumption of an observation or and estimate of it if the env is still running
         # Uses minimum possible energy for each unscheduled task
-        task_energy_consumption = np.ones(len(self.task_observations)) * 1e8
-        for task_id in range(len(self.task_observations)):
-            # Check if already scheduled task
-            if self.task_observations[task_id].assigned_vm_id is not None:
-                task_energy_consumption[task_id] = self.task_observations[task_id].energy_consumption
-                continue
+        task_energy_consumption = self.task_min_energy_cost.copy()
 
-            compatible_vm_ids = [vid for tid, vid in self.compatibilities if tid == task_id]
-            for vm_id in compatible_vm_ids:
-                energy_consumption_rate = active_energy_consumption_per_mi(self.vm_observations[vm_id])
-                new_energy_consumption = self.task_observations[task_id].length * energy_consumption_rate
-                task_energy_consumption[task_id] = min(new_energy_consumption, task_energy_consumption[task_id].item())
+        # Already scheduled tasks have the actual energy consumption
+        for task_id, task in enumerate(self.task_observations):
+            if task.assigned_vm_id is not None:
+                task_energy_consumption[task_id] = task.energy_consumption
 
         self._energy_consumption = float(task_energy_consumption.sum())
         return self._energy_consumption
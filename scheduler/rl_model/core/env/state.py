@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from scheduler.rl_model.core.types import TaskDto, VmDto
 from scheduler.rl_model.core.utils.task_mapper import TaskMapper
 
@@ -33,3 +35,12 @@ class StaticState:
     tasks: list[TaskDto]
     vms: list[VmDto]
     compatibilities: list[tuple[int, int]]
+    # Compatible VMs of each task (compatibilities grouped by task)
+    task_compatible_vm_ids: list[np.ndarray]
+    # Parents of each task in the workflows (children are in the tasks)
+    task_parent_ids: list[list[int]]
+    # Execution time and energy of each task on each VM (task x VM, only compatible pairs are meaningful)
+    task_vm_time_cost: np.ndarray
+    task_vm_energy_cost: np.ndarray
+    # Minimum energy of each task over its compatible VMs
+    task_min_energy_cost: np.ndarray
@@ -33,15 +33,34 @@ def main():
     obs, info = env.reset(seed=0)
     tensor_obs = torch.Tensor(obs)
     ic(mapper.unmap(tensor_obs))
+    all_tensor_obs = [tensor_obs]
     while True:
-        action, *_ = agent.get_action_and_value(tensor_obs.reshape(1, -1))
+        action = agent.get_action(tensor_obs.reshape(1, -1))
         ic(action)
-        obs, reward, terminated, truncated, info = env.step(action)
+        obs, reward, terminated, truncated, info = env.step(int(action.item()))
         tensor_obs = torch.Tensor(obs)
         ic(mapper.unmap(tensor_obs), reward)
         if terminated or truncated:
             ic(info)
             break
+        all_tensor_obs.append(tensor_obs)
+
+    check_batch_consistency(agent, torch.stack(all_tensor_obs))
+
+
+def check_batch_consistency(agent: GinAgent, batch_obs: torch.Tensor):
+    """Check that the outputs of a batch of observations are same as the outputs of each observation on its own."""
+    with torch.no_grad():
+        actions = agent.get_action(batch_obs)
+        _, log_probs, entropies, values = agent.get_action_and_value(batch_obs, actions)
+        for i in range(batch_obs.shape[0]):
+            _, row_log_prob, row_entropy, row_value = agent.get_action_and_value(
+                batch_obs[i : i + 1], actions[i : i + 1]
+            )
+            assert torch.allclose(log_probs[i], row_log_prob[0], atol=1e-5), "Log probability depends on the batch"
+            assert torch.allclose(entropies[i], row_entropy[0], atol=1e-5), "Entropy depends on the batch"
+            assert torch.allclose(values[i], row_value[0], atol=1e-5), "Value depends on the batch"
+    ic("Batched and per observation outputs match", batch_obs.shape[0])
 
 
 if __name__ == "__main__":
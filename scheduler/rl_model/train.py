@@ -34,7 +34,7 @@ class Args:
     output_dir: str = "logs"
     """the output directory of the experiment"""
     torch_deterministic: bool = True
-    """if toggled, `torch.backends.cudnn.deterministic=False`"""
+    """if toggled, `torch.backends.cudnn.deterministic=True` and `torch.backends.cudnn.benchmark=False`"""
     cuda: bool = True
     """if toggled, cuda will be enabled by default"""
     track: bool = False
@@ -49,6 +49,8 @@ class Args:
     """Directory to load the model from"""
     test_iterations: int = 4
     """number of test iterations"""
+    compile_model: bool = False
+    """if toggled, the networks of the agent are compiled with `torch.compile`"""
 
     # Algorithm specific arguments
     total_timesteps: int = 2_000_000
@@ -172,6 +174,8 @@ def train(args: Args):
     np.random.seed(args.seed)
     torch.manual_seed(args.seed)
     torch.backends.cudnn.deterministic = args.torch_deterministic
+    # cuDNN autotuning picks the fastest kernels, but they may be non-deterministic (so only when not required)
+    torch.backends.cudnn.benchmark = not args.torch_deterministic
 
     device = torch.device("cuda" if torch.cuda.is_available() and args.cuda else "cpu")
 
@@ -191,6 +195,11 @@ def train(args: Args):
         model_path = Path(__file__).parent.parent.parent / "logs" / args.load_model_dir / "model.pt"
         agent.load_state_dict(torch.load(str(model_path), weights_only=True))
         print(f"Loaded model from {model_path}")
+    if args.compile_model:
+        # Compiled in place, so the state dict keys (saved models) stay the same
+        # Graph sizes change every step, so the networks are compiled with dynamic shapes
+        for module in agent.children():
+            module.compile(dynamic=True)
 
     ic(agent)
     optimizer = optim.Adam(agent.parameters(), lr=args.learning_rate, eps=1e-5)
@@ -233,8 +242,10 @@ def train(args: Args):
             # TRY NOT TO MODIFY: execute the game and log data.
             next_obs, reward, terminations, truncations, infos = envs.step(action.cpu().numpy())
             next_done = np.logical_or(terminations, truncations)
-            rewards[step] = torch.Tensor(reward).to(device).view(-1)
-            next_obs_tensor, next_done_tensor = torch.Tensor(next_obs).to(device), torch.Tensor(next_done).to(device)
+            # Copy the step results into the preallocated tensors
+            rewards[step].copy_(torch.from_numpy(reward).view(-1))
+            next_obs_tensor.copy_(torch.from_numpy(next_obs))
+            next_done_tensor.copy_(torch.from_numpy(next_done))
 
             if "final_info" in infos:
                 for info in infos["final_info"]:
@@ -336,7 +347,7 @@ def train(args: Args):
         writer.add_scalar("losses/explained_variance", explained_var, global_step)
         writer.add_scalar("charts/SPS", int(global_step / (time.time() - start_time)), global_step)
 
-        with torch.no_grad():
+        with torch.inference_mode():
             test_results = test_agent(agent, args)
             writer.add_scalar("tests/makespan", test_results[0], global_step)
             writer.add_scalar("tests/energy_consumption", test_results[1], global_step)
@@ -361,18 +372,25 @@ def test_agent(agent: Agent, args: Args):
     total_makespan = 0.0
     total_energy_consumption = 0.0
 
-    for seed_index in range(args.test_iterations):
-        test_env = make_test_env(args)
-
-        next_obs, _ = test_env.reset(seed=MIN_TESTING_DS_SEED + seed_index)
-        while True:
-            obs_tensor = torch.from_numpy(next_obs.astype(np.float32).reshape(1, -1))
-            action, _, _, _ = agent.get_action_and_value(obs_tensor)
-            vm_action = int(action.item())
-            next_obs, _, terminated, truncated, _ = test_env.step(vm_action)
-            if terminated or truncated:
-                break
-
+    # Test environments are run together, actions of all running environments are chosen in one batch
+    # (Each environment has its own seed, graphs are normalized separately so the batch does not change the actions)
+    test_envs = [make_test_env(args) for _ in range(args.test_iterations)]
+    next_obs = [
+        test_env.reset(seed=MIN_TESTING_DS_SEED + seed_index)[0] for seed_index, test_env in enumerate(test_envs)
+    ]
+    running_env_indices = list(range(len(test_envs)))
+    while running_env_indices:
+        obs_tensor = torch.from_numpy(np.stack([next_obs[i] for i in running_env_indices]).astype(np.float32))
+        actions = agent.get_action(obs_tensor).tolist()
+
+        next_running_env_indices: list[int] = []
+        for env_index, vm_action in zip(running_env_indices, actions):
+            next_obs[env_index], _, terminated, truncated, _ = test_envs[env_index].step(int(vm_action))
+            if not (terminated or truncated):
+                next_running_env_indices.append(env_index)
+        running_env_indices = next_running_env_indices
+
+    for test_env in test_envs:
         assert test_env.prev_obs is not None
         total_makespan += test_env.prev_obs.makespan()
         total_energy_consumption += test_env.prev_obs.energy_consumption()
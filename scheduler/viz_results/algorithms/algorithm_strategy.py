@@ -1,44 +1,110 @@
+from typing import Callable
+
 from scheduler.config.settings import DEFAULT_MODEL_DIR
 from scheduler.viz_results.algorithms.base import BaseScheduler
-from scheduler.viz_results.algorithms.best_fit import BestFitScheduler
-from scheduler.viz_results.algorithms.cp_sat import CpSatScheduler
-from scheduler.viz_results.algorithms.ferpts import FerptsScheduler
-from scheduler.viz_results.algorithms.ga import GAScheduler
-from scheduler.viz_results.algorithms.gin_agent import GinAgentScheduler
-from scheduler.viz_results.algorithms.heft_ins import InsertionHeftScheduler
-from scheduler.viz_results.algorithms.heft import HeftScheduler
-from scheduler.viz_results.algorithms.max_min import MaxMinScheduler
-from scheduler.viz_results.algorithms.min_min import MinMinScheduler
-from scheduler.viz_results.algorithms.power_saving import PowerSavingScheduler
-from scheduler.viz_results.algorithms.random import RandomScheduler
-from scheduler.viz_results.algorithms.round_robin import RoundRobinScheduler
+
+
+# Scheduler factories (each factory imports its scheduler, so only the requested scheduler module is loaded)
+# Some schedulers pull heavy dependencies - ortools, heft, pygad, torch
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _random_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.random import RandomScheduler
+
+    return RandomScheduler()
+
+
+def _round_robin_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.round_robin import RoundRobinScheduler
+
+    return RoundRobinScheduler()
+
+
+def _ferpts_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.ferpts import FerptsScheduler
+
+    return FerptsScheduler()
+
+
+def _best_fit_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.best_fit import BestFitScheduler
+
+    return BestFitScheduler()
+
+
+def _min_min_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.min_min import MinMinScheduler
+
+    return MinMinScheduler()
+
+
+def _max_min_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.max_min import MaxMinScheduler
+
+    return MaxMinScheduler()
+
+
+def _heft_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.heft import HeftScheduler
+
+    return HeftScheduler()
+
+
+def _power_saving_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.power_saving import PowerSavingScheduler
+
+    return PowerSavingScheduler()
+
+
+def _cp_sat_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.cp_sat import CpSatScheduler
+
+    return CpSatScheduler()
+
+
+def _insertion_heft_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.heft_ins import InsertionHeftScheduler
+
+    return InsertionHeftScheduler()
+
+
+def _ga_scheduler(_: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.ga import GAScheduler
+
+    return GAScheduler()
+
+
+def _gin_scheduler(args: list[str]) -> BaseScheduler:
+    from scheduler.viz_results.algorithms.gin_agent import GinAgentScheduler
+
+    return GinAgentScheduler(model_path=str(DEFAULT_MODEL_DIR / args[0] / args[1]))
+
+
+# Scheduler factories by strategy name (factories take the arguments given after the strategy)
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+_SCHEDULERS: dict[str, Callable[[list[str]], BaseScheduler]] = {
+    "random": _random_scheduler,
+    "round_robin": _round_robin_scheduler,
+    "ferpts": _ferpts_scheduler,
+    "best_fit": _best_fit_scheduler,
+    "min_min": _min_min_scheduler,
+    "max_min": _max_min_scheduler,
+    "heft": _heft_scheduler,
+    "power_saving": _power_saving_scheduler,
+    "cp_sat": _cp_sat_scheduler,
+    "insertion_heft": _insertion_heft_scheduler,
+    "ga": _ga_scheduler,
+    "gin": _gin_scheduler,
+}
 
 
 def get_scheduler(algorithm: str) -> BaseScheduler:
     strategy, *args = algorithm.split(":")
-    if strategy == "random":
-        return RandomScheduler()
-    if strategy == "round_robin":
-        return RoundRobinScheduler()
-    if strategy == "ferpts":
-        return FerptsScheduler()
-    elif strategy == "best_fit":
-        return BestFitScheduler()
-    elif strategy == "min_min":
-        return MinMinScheduler()
-    elif strategy == "max_min":
-        return MaxMinScheduler()
-    elif strategy == "cp_sat":
-        return CpSatScheduler()
-    elif strategy == "insertion_heft":
-        return InsertionHeftScheduler()
-    elif strategy == "heft":
-        return HeftScheduler()
-    elif strategy == "power_saving":
-        return PowerSavingScheduler()
-    elif strategy == "ga":
-        return GAScheduler()
-    elif strategy == "gin":
-        return GinAgentScheduler(model_path=str(DEFAULT_MODEL_DIR / args[0] / args[1]))
-    else:
-        raise ValueError(f"Unknown algorithm: {algorithm}")
+    try:
+        scheduler_factory = _SCHEDULERS[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm: {algorithm}") from None
+    return scheduler_factory(args)
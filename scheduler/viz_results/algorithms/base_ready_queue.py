@@ -1,4 +1,7 @@
+import heapq
+import itertools
 from abc import ABC, abstractmethod
+from collections import defaultdict
 
 from scheduler.rl_model.core.types import TaskDto, VmDto, VmAssignmentDto, TaskIdType, VmIdType
 from scheduler.viz_results.algorithms.base import BaseScheduler
@@ -12,6 +15,8 @@ class BaseReadyQueueScheduler(BaseScheduler, ABC):
     1. Initialize the ready queue with start tasks in each workflow.
     2. While the ready queue is not empty:
         - Choose the next task to schedule. (Implement this in the subclass)
+          If the subclass scans the ready tasks, it gets all of them in the order they became ready.
+          Otherwise the ready queue is a heap ordered by the task priority and only the front task is given.
         - Schedule the task on a VM. (Implement this in the subclass)
         - Update the ready tasks based on the dependencies.
     """
@@ -21,56 +26,75 @@ class BaseReadyQueueScheduler(BaseScheduler, ABC):
     est_vm_completion_times: dict[VmIdType, float] | None = None
     est_task_min_start_times: dict[TaskIdType, float] | None = None
 
-    _ready_tasks: list[TaskIdType]
+    # Whether select_task_and_vm looks at all ready tasks (False if it always takes the front of the ready queue)
+    scans_ready_tasks: bool = True
+
+    _ready_tasks: list[tuple[float, int, TaskIdType]]
+    _ready_task_ids: dict[TaskIdType, None]
+    _ready_counter: itertools.count
     _processed_tasks: set[TaskIdType]
+    _pending_parent_counts: dict[TaskIdType, int]
+    _child_task_ids: dict[TaskIdType, list[TaskIdType]]
 
     def schedule(self, tasks: list[TaskDto], vms: list[VmDto]) -> list[VmAssignmentDto]:
         assignments: list[VmAssignmentDto] = []
 
-        self.task_map = {self.tid(_task): _task for _task in tasks}
-        self.vm_map = {self.vid(_vm): _vm for _vm in vms}
-
-        self.est_vm_completion_times = {self.vid(_vm): 0.0 for _vm in vms}  # Time when the VM will be free
-        self.est_task_min_start_times = {self.tid(_task): 0.0 for _task in tasks}  # Min time when the task can start
-
-        self._ready_tasks = [self.tid(_task) for _task in tasks if _task.id == 0]
+        task_map = {(_task.workflow_id, _task.id): _task for _task in tasks}
+        self.task_map = task_map
+        self.vm_map = {_vm.id: _vm for _vm in vms}
+
+        est_vm_completion_times = dict.fromkeys(self.vm_map, 0.0)  # Time when the VM will be free
+        est_task_min_start_times = dict.fromkeys(task_map, 0.0)  # Min time when the task can start
+        self.est_vm_completion_times = est_vm_completion_times
+        self.est_task_min_start_times = est_task_min_start_times
+
+        # Children of each task (as task ids) and number of parents of each task that are not processed yet
+        # (task is ready when this reaches 0)
+        self._child_task_ids = {
+            (_task.workflow_id, _task.id): [(_task.workflow_id, child_id) for child_id in _task.child_ids]
+            for _task in tasks
+        }
+        self._pending_parent_counts = defaultdict(int)
+        for child_task_ids in self._child_task_ids.values():
+            for child_task_id in child_task_ids:
+                self._pending_parent_counts[child_task_id] += 1
+
+        self._ready_tasks = []
+        self._ready_task_ids = {}  # Ready tasks in the order they became ready (only used if scanning)
+        self._ready_counter = itertools.count()  # Tie-breaker, keeps the insertion order for equal priorities
         self._processed_tasks: set[TaskIdType] = set()
-
-        while self._ready_tasks:
-            ready_task_objs = [self.get_task(task_id) for task_id in self._ready_tasks]
+        for _task in tasks:
+            if _task.id == 0 or self._pending_parent_counts[(_task.workflow_id, _task.id)] == 0:
+                self._push_ready_task(_task)
+
+        while self._ready_tasks or self._ready_task_ids:
+            if self.scans_ready_tasks:
+                ready_task_objs = [task_map[task_id] for task_id in self._ready_task_ids]
+            else:
+                ready_task_objs = [task_map[self._ready_tasks[0][2]]]
             selected_task, selected_vm = self.select_task_and_vm(ready_task_objs, vms)
-            selected_task_id = self.tid(selected_task)
-            self._ready_tasks.remove(selected_task_id)
+            selected_task_id = (selected_task.workflow_id, selected_task.id)
+            selected_vm_id = selected_vm.id
+            self._pop_ready_task(selected_task_id)
             self._processed_tasks.add(selected_task_id)
 
-            assignments.append(VmAssignmentDto(selected_vm.id, selected_task.workflow_id, selected_task.id))
+            assignments.append(VmAssignmentDto(selected_vm_id, selected_task.workflow_id, selected_task.id))
 
-            # Update the completion time of the VM and the min start time of the child tasks
+            # Update the completion time of the VM
             computation_time = selected_task.length / selected_vm.cpu_speed_mips
             completion_time = (
-                max(
-                    self.est_vm_completion_times[self.vid(selected_vm)],
-                    self.est_task_min_start_times[self.tid(selected_task)],
-                )
+                max(est_vm_completion_times[selected_vm_id], est_task_min_start_times[selected_task_id])
                 + computation_time
             )
-            self.est_vm_completion_times[self.vid(selected_vm)] = completion_time
-            for child_id in selected_task.child_ids:
-                child_task_id_1: TaskIdType = (selected_task.workflow_id, child_id)
-                self.est_task_min_start_times[child_task_id_1] = max(
-                    completion_time, self.est_task_min_start_times[child_task_id_1]
-                )
-
-            # Update the ready tasks
-            for child_id in selected_task.child_ids:
-                child_task_id_2: TaskIdType = (selected_task.workflow_id, child_id)
-                all_parents_processed = all(
-                    self.tid(parent) in self._processed_tasks
-                    for parent in tasks
-                    if parent.workflow_id == selected_task.workflow_id and child_id in parent.child_ids
-                )
-                if all_parents_processed and child_task_id_2 not in self._ready_tasks:
-                    self._ready_tasks.append(child_task_id_2)
+            est_vm_completion_times[selected_vm_id] = completion_time
+
+            # Update the min start time of the child tasks and the ready tasks
+            for child_task_id in self._child_task_ids[selected_task_id]:
+                if completion_time > est_task_min_start_times[child_task_id]:
+                    est_task_min_start_times[child_task_id] = completion_time
+                self._pending_parent_counts[child_task_id] -= 1
+                if self._pending_parent_counts[child_task_id] == 0:
+                    self._push_ready_task(task_map[child_task_id])
 
         assert len(assignments) == len(tasks), f"Expected {len(tasks)} assignments, got {len(assignments)}"
         self.est_vm_completion_times = None
@@ -83,9 +107,13 @@ class BaseReadyQueueScheduler(BaseScheduler, ABC):
 
         return next_task, selected_vm
 
+    def task_priority(self, task: TaskDto) -> float:
+        """Priority of the task in the ready queue (lower values are at the front, not used if scanning)."""
+        return 0.0
+
     @abstractmethod
     def select_task(self, ready_tasks: list[TaskDto]) -> TaskDto:
-        """Out of the ready tasks, choose the next task to schedule."""
+        """Out of the ready tasks (only the front of the queue if not scanning), choose the next task to schedule."""
         raise NotImplementedError
 
     @abstractmethod
@@ -119,7 +147,7 @@ class BaseReadyQueueScheduler(BaseScheduler, ABC):
 
     def is_ready(self, task_id: TaskIdType) -> bool:
         """Check if the task is ready to be scheduled."""
-        return task_id in self._ready_tasks
+        return self._pending_parent_counts.get(task_id, 0) == 0 and not self.is_processed(task_id)
 
     def is_processed(self, task_id: TaskIdType) -> bool:
         """Check if the task has been processed."""
@@ -128,3 +156,20 @@ class BaseReadyQueueScheduler(BaseScheduler, ABC):
     def is_pending(self, task_id: TaskIdType) -> bool:
         """Check if the task is pending."""
         return not self.is_ready(task_id) and not self.is_processed(task_id)
+
+    def _push_ready_task(self, task: TaskDto):
+        """Add the task to the ready queue."""
+        if self.scans_ready_tasks:
+            self._ready_task_ids[(task.workflow_id, task.id)] = None
+            return
+        heapq.heappush(
+            self._ready_tasks, (self.task_priority(task), next(self._ready_counter), (task.workflow_id, task.id))
+        )
+
+    def _pop_ready_task(self, task_id: TaskIdType):
+        """Remove the task from the ready queue."""
+        if self.scans_ready_tasks:
+            del self._ready_task_ids[task_id]
+            return
+        assert self._ready_tasks[0][2] == task_id, "Only the front of the ready queue can be selected if not scanning"
+        heapq.heappop(self._ready_tasks)
@@ -1,5 +1,6 @@
-from scheduler.rl_model.core.types import TaskDto, VmDto
-from scheduler.rl_model.core.utils.helpers import is_suitable
+import numpy as np
+
+from scheduler.rl_model.core.types import TaskDto, VmDto, VmAssignmentDto
 from scheduler.viz_results.algorithms.base_ready_queue import BaseReadyQueueScheduler
 
 
@@ -11,6 +12,18 @@ class BestFitScheduler(BaseReadyQueueScheduler):
     The algorithm selects the VM that has the best fit for the task. (RAM)
     """
 
+    scans_ready_tasks = False
+
+    _vm_memory_mb: np.ndarray
+    _vm_completion_times: np.ndarray
+    _selected_vm_index: int | None
+
+    def schedule(self, tasks: list[TaskDto], vms: list[VmDto]) -> list[VmAssignmentDto]:
+        self._vm_memory_mb = np.fromiter((vm.memory_mb for vm in vms), dtype=np.float64, count=len(vms))
+        self._vm_completion_times = np.zeros(len(vms), dtype=np.float64)
+        self._selected_vm_index = None
+        return super().schedule(tasks, vms)
+
     def select_task(self, ready_tasks: list[TaskDto]) -> TaskDto:
         """Choose the next task (with no preference)."""
         return ready_tasks[0]
@@ -20,27 +33,21 @@ class BestFitScheduler(BaseReadyQueueScheduler):
         assert self.est_vm_completion_times is not None
         assert self.est_task_min_start_times is not None
 
-        best_vm = None
-        best_vm_allocation = -float("inf")
-        for vm in vms:
-            if not is_suitable(vm, task):
-                continue
-            vm_allocation = task.req_memory_mb / vm.memory_mb
-            assert 0 <= vm_allocation <= 1, f"Invalid VM allocation: {vm_allocation}"
-
-            # If the current VM has a better fit, update the best VM
-            if vm_allocation > best_vm_allocation:
-                best_vm = vm
-                best_vm_allocation = vm_allocation
-
-            # If the current VM has the same memory, check the estimated completion time
-            elif vm_allocation == best_vm_allocation:
-                assert best_vm is not None
-                if self.est_vm_completion_times[self.vid(vm)] < self.est_vm_completion_times[self.vid(best_vm)]:
-                    best_vm = vm
-                    best_vm_allocation = vm_allocation
-
-        if best_vm is None:
+        # Only the previously selected VM has a new completion time since the last selection
+        if self._selected_vm_index is not None:
+            selected_vm_id = vms[self._selected_vm_index].id
+            self._vm_completion_times[self._selected_vm_index] = self.est_vm_completion_times[selected_vm_id]
+
+        # Allocation of each VM if the task is assigned to it (-inf if the task does not fit)
+        vm_suitable = self._vm_memory_mb >= task.req_memory_mb
+        vm_allocations = np.where(vm_suitable, task.req_memory_mb / self._vm_memory_mb, -np.inf)
+        suitable_vm_allocations = vm_allocations[vm_suitable]
+        assert np.all((suitable_vm_allocations >= 0) & (suitable_vm_allocations <= 1)), "Invalid VM allocation"
+        best_vm_allocation = vm_allocations.max()
+        if best_vm_allocation == -np.inf:
             raise Exception("No VM found for task")
 
-        return best_vm
+        # If several VMs have the same best fit, choose the one with the earliest estimated completion time
+        vm_completion_times = np.where(vm_allocations == best_vm_allocation, self._vm_completion_times, np.inf)
+        self._selected_vm_index = int(vm_completion_times.argmin())
+        return vms[self._selected_vm_index]
@@ -11,11 +11,19 @@ class FerptsScheduler(BaseScheduler):
         mapper = TaskMapper(tasks)
         mapped_tasks = mapper.map_tasks()
 
+        parent_ids: dict[int, list[int]] = {m_task.id: [] for m_task in mapped_tasks}
+        for m_task in mapped_tasks:
+            for child_id in m_task.child_ids:
+                parent_ids[child_id].append(m_task.id)
+
         vm_ready_times = {vm.id: 0.0 for vm in vms}
         task_completion_times = {}
         assignments = []
 
         for m_task in mapped_tasks:
+            parent_completion_time = max(
+                (task_completion_times[parent_id] for parent_id in parent_ids[m_task.id]), default=0.0
+            )
             best_vm, min_cost = None, float("inf")
 
             for vm in vms:
@@ -23,12 +31,7 @@ class FerptsScheduler(BaseScheduler):
                     continue
 
                 ready_time = vm_ready_times[vm.id]
-                parent_completion_times = [
-                    task_completion_times[parent_task.id]
-                    for parent_task in mapped_tasks
-                    if m_task.id in parent_task.child_ids
-                ]
-                start_time = max(ready_time, max(parent_completion_times, default=0.0))
+                start_time = max(ready_time, parent_completion_time)
                 finish_time = start_time + (m_task.length / vm.cpu_speed_mips)
 
                 # Calculate energy cost based on runtime and power usage
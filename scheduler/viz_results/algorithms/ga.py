@@ -1,7 +1,6 @@
 from typing import Any
 
 import numpy as np
-from icecream import ic
 from pygad import pygad
 
 from scheduler.rl_model.core.types import TaskDto, VmDto, VmAssignmentDto
@@ -46,12 +45,10 @@ class GAScheduler(BaseScheduler):
             mutation_type="random",
             mutation_percent_genes=10,
             fitness_func=lambda ga, sol, idx: self.fitness(sol),
-            # on_generation=lambda x: ic(x.best_solution()[1]),
         )
 
         ga_instance.run()
-        best_solution, best_solution_fitness, _ = ga_instance.best_solution()
-        ic(best_solution, best_solution_fitness)
+        best_solution, _, _ = ga_instance.best_solution()
 
         vm_assignments = []
         for task_index, vm_index in enumerate(best_solution):
@@ -12,13 +12,15 @@ from scheduler.viz_results.algorithms.base import BaseScheduler
 class GinAgentScheduler(BaseScheduler):
     vm_completion_time: np.ndarray | None = None
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, device: torch.device | None = None):
         self.model_path = model_path
+        self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-    def schedule(self, tasks: list[TaskDto], vms: list[VmDto]) -> list[VmAssignmentDto]:
-        agent = GinAgent(device=torch.device("cpu"))
-        agent.load_state_dict(torch.load(str(self.model_path), weights_only=True))
+        # Model is loaded once and reused for all the schedule calls
+        self.agent = GinAgent(device=self.device)
+        self.agent.load_state_dict(torch.load(str(self.model_path), map_location=self.device, weights_only=True))
 
+    def schedule(self, tasks: list[TaskDto], vms: list[VmDto]) -> list[VmAssignmentDto]:
         if self.vm_completion_time is None:
             self.vm_completion_time = np.zeros(len(vms))
 
@@ -41,11 +43,12 @@ class GinAgentScheduler(BaseScheduler):
             )
         )
 
-        # Run environment
+        # Run environment (no autograd needed for choosing actions)
         obs, info = env.reset(seed=0)
         while True:
-            tensor_obs = torch.Tensor(obs).reshape(1, -1)
-            action, *_ = agent.get_action_and_value(tensor_obs)
+            tensor_obs = torch.Tensor(obs).reshape(1, -1).to(self.device)
+            with torch.inference_mode():
+                action = self.agent.get_action(tensor_obs)
             obs, reward, terminated, truncated, info = env.step(int(action.item()))
             if terminated or truncated:
                 break
@@ -5,7 +5,6 @@ from heft import heft
 import numpy as np
 
 from scheduler.rl_model.core.types import VmAssignmentDto, TaskDto, VmDto
-from scheduler.rl_model.core.utils.helpers import is_suitable
 from scheduler.viz_results.algorithms.base import BaseScheduler
 
 ScheduleType = dict[int, list[heft.ScheduleEvent]]
@@ -19,61 +18,80 @@ class InsertionHeftScheduler(BaseScheduler):
     Following implementation uses library: https://github.com/mackncheesiest/heft
     """
 
+    _comm_vm_count: int | None = None
+    _comm_matrix: np.ndarray
+    _comm_startup: np.ndarray
+
     def schedule(self, tasks: list[TaskDto], vms: list[VmDto]) -> list[VmAssignmentDto]:
-        # Group tasks by workflow
+        # Group tasks by workflow (sorted by task id, rows of the HEFT cost matrix are indexed by the task id)
         grouped_tasks: defaultdict[int, list[TaskDto]] = defaultdict(list)
         for task in tasks:
             grouped_tasks[task.workflow_id].append(task)
+        for task_list in grouped_tasks.values():
+            task_list.sort(key=lambda t: t.id)
+
+        # Task ids of each workflow start after the tasks (+ dummy task) of the previous workflows
+        workflow_ids = list(grouped_tasks.keys())
+        workflow_task_counts = [len(task_list) for task_list in grouped_tasks.values()]
+        workflow_task_start_ids = np.cumsum([0] + [count + 1 for count in workflow_task_counts[:-1]])
 
         # Schedule each workflow
         schedule: ScheduleType | None = None
-        assignments: list[tuple[float, VmAssignmentDto]] = []
-        assigning_task_start_id = 0
-        for workflow_id, task_list in grouped_tasks.items():
+        starts: list[float] = []
+        vm_ids: list[int] = []
+        workflow_indices: list[int] = []
+        scheduled_task_ids: list[int] = []
+        for workflow_index, task_list in enumerate(grouped_tasks.values()):
             schedule = self.schedule_workflow(task_list, vms, schedule)
-            # Convert the schedule to a list of assignments
             for vm_id, events in schedule.items():
                 for event in events:
-                    actual_task_id = event.task - assigning_task_start_id
-                    # We only care about tasks from the current workflow (events has old workflows + dummy tasks)
-                    if 0 <= actual_task_id < len(task_list):
-                        assignments.append((event.start, VmAssignmentDto(vm_id, workflow_id, actual_task_id)))
-            assigning_task_start_id += len(task_list) + 1
+                    starts.append(event.start)
+                    vm_ids.append(vm_id)
+                    workflow_indices.append(workflow_index)
+                    scheduled_task_ids.append(event.task)
+
+        # Convert the schedule to a list of assignments
+        # We only care about tasks from the workflow scheduled at that step (events has old workflows + dummy tasks)
+        workflow_index_arr = np.array(workflow_indices, dtype=np.int64)
+        actual_task_ids = np.array(scheduled_task_ids, dtype=np.int64) - workflow_task_start_ids[workflow_index_arr]
+        is_current = (0 <= actual_task_ids) & (actual_task_ids < np.array(workflow_task_counts)[workflow_index_arr])
 
         # Sort assignments by start time (make sure the order is correct)
-        assignments.sort(key=lambda x: x[0])
-        return [assignment for _, assignment in assignments]
+        (current_indices,) = np.nonzero(is_current)
+        order = current_indices[np.argsort(np.array(starts)[current_indices], kind="stable")]
+        return [VmAssignmentDto(vm_ids[i], workflow_ids[workflow_index_arr[i]], int(actual_task_ids[i])) for i in order]
 
-    @staticmethod
-    def schedule_workflow(tasks: list[TaskDto], vms: list[VmDto], schedule: ScheduleType | None) -> ScheduleType:
+    def schedule_workflow(self, tasks: list[TaskDto], vms: list[VmDto], schedule: ScheduleType | None) -> ScheduleType:
         total_tasks = len(tasks) + 1  # Add a dummy task to represent the end of the workflow
         total_vms = len(vms)
         dummy_task_id = total_tasks - 1
 
-        # Computational cost between tasks and vms (+ dummy task)
+        # Computational cost between tasks and vms (+ dummy task with 0 cost)
+        task_lengths = np.fromiter((task.length for task in tasks), dtype=np.float64, count=len(tasks))
+        task_req_memory_mb = np.fromiter((task.req_memory_mb for task in tasks), dtype=np.float64, count=len(tasks))
+        vm_speeds = np.fromiter((vm.cpu_speed_mips for vm in vms), dtype=np.float64, count=total_vms)
+        vm_memory_mb = np.fromiter((vm.memory_mb for vm in vms), dtype=np.float64, count=total_vms)
         comp_matrix = np.zeros((total_tasks, total_vms))
-        for i in range(total_tasks - 1):  # Exclude the dummy task
-            for j in range(total_vms):
-                if not is_suitable(vms[j], tasks[i]):
-                    comp_matrix[i, j] = np.inf
-                else:
-                    comp_matrix[i, j] = tasks[i].length / vms[j].cpu_speed_mips
-        # Communication cost between tasks - 0 if tasks are on the same VM, 1 otherwise
-        comm_matrix = 1 - np.eye(total_vms)
-        # Communication startup for VMs - 0 for all VMs
-        comm_startup = np.zeros(total_vms)
+        comp_matrix[:-1] = task_lengths[:, None] / vm_speeds[None, :]
+        comp_matrix[:-1][task_req_memory_mb[:, None] > vm_memory_mb[None, :]] = np.inf  # Not suitable
+        if self._comm_vm_count != total_vms:
+            # Communication costs only depend on the number of VMs (computed once for all workflows)
+            # Communication cost between tasks - 0 if tasks are on the same VM, 1 otherwise
+            self._comm_matrix = 1 - np.eye(total_vms)
+            # Communication startup for VMs - 0 for all VMs
+            self._comm_startup = np.zeros(total_vms)
+            self._comm_vm_count = total_vms
 
         dag: nx.DiGraph = nx.DiGraph()
         dag.add_node(dummy_task_id)  # Add a dummy node to represent the end of the workflow
+        # Every task has an outgoing edge (tasks without children lead to the dummy task), so all tasks are added
+        dag.add_edges_from(
+            ((task.id, child_id) for task in tasks for child_id in (task.child_ids or [dummy_task_id])),
+            weight=1,
+        )
 
-        for task in tasks:
-            dag.add_node(task.id)
-            if not task.child_ids:
-                dag.add_edge(task.id, dummy_task_id, weight=1)
-                continue
-            for child_id in task.child_ids:
-                dag.add_edge(task.id, child_id, weight=1)
-
-        schedule, _, _ = heft.schedule_dag(dag, comp_matrix, comm_matrix, comm_startup, proc_schedules=schedule)
+        schedule, _, _ = heft.schedule_dag(
+            dag, comp_matrix, self._comm_matrix, self._comm_startup, proc_schedules=schedule
+        )
         assert schedule is not None, "HEFT scheduling failed"
         return schedule
@@ -11,14 +11,6 @@ class MaxMinScheduler(MinMinScheduler):
     This is a variant of the MinMin algorithm choosing the task with the largest length first.
     """
 
-    def select_task(self, ready_tasks: list[TaskDto]) -> TaskDto:
-        """Choose the task with the largest length."""
-        largest_task = None
-        largest_task_length = -float("inf")
-        for task in ready_tasks:
-            if task.length > largest_task_length:
-                largest_task_length = task.length
-                largest_task = task
-        assert largest_task is not None
-
-        return largest_task
+    def task_priority(self, task: TaskDto) -> float:
+        """Order the ready tasks by the length (largest first)."""
+        return -task.length
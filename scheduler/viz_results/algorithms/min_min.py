@@ -11,17 +11,15 @@ class MinMinScheduler(BaseReadyQueueScheduler):
     on the VM that will complete the task the fastest.
     """
 
+    scans_ready_tasks = False
+
+    def task_priority(self, task: TaskDto) -> float:
+        """Order the ready tasks by the length (smallest first)."""
+        return task.length
+
     def select_task(self, ready_tasks: list[TaskDto]) -> TaskDto:
         """Choose the task with the smallest length."""
-        smallest_task = None
-        smallest_task_length = float("inf")
-        for task in ready_tasks:
-            if task.length < smallest_task_length:
-                smallest_task_length = task.length
-                smallest_task = task
-        assert smallest_task is not None
-
-        return smallest_task
+        return ready_tasks[0]
 
     def select_vm(self, task: TaskDto, vms: list[VmDto]) -> VmDto:
         """Schedule the task on the VM that will complete the task the fastest."""
@@ -31,13 +29,13 @@ class MinMinScheduler(BaseReadyQueueScheduler):
         # Select the best VM by comparing the completion times
         best_vm = None
         best_vm_completion_time = float("inf")
+        task_min_start_time = self.est_task_min_start_times[(task.workflow_id, task.id)]
         for vm in vms:
             if not is_suitable(vm, task):
                 continue
 
             completion_time = (
-                max(self.est_vm_completion_times[self.vid(vm)], self.est_task_min_start_times[self.tid(task)])
-                + task.length / vm.cpu_speed_mips
+                max(self.est_vm_completion_times[vm.id], task_min_start_time) + task.length / vm.cpu_speed_mips
             )
             if best_vm_completion_time > completion_time:
                 best_vm = vm
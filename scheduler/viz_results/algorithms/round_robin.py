@@ -10,6 +10,8 @@ class RoundRobinScheduler(BaseReadyQueueScheduler):
     Round Robin is a simple scheduling algorithm that schedules the tasks in a circular order.
     """
 
+    scans_ready_tasks = False
+
     vm_index: int = 0
 
     def select_task(self, ready_tasks: list[TaskDto]) -> TaskDto:
@@ -1,6 +1,8 @@
 import itertools
 import random
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -28,6 +30,9 @@ class Args:
     """file to output the export CSV"""
     num_samples_per_setting: int = 10
     """number of iterations to evaluate in a setting"""
+    num_workers: int = 1
+    """number of evaluations to run in parallel (each evaluation runs its own simulator process)
+    Time column is measured while the evaluations compete for the CPU, so it is only comparable with num_workers=1"""
     settings: list["EvaluationSetting"] = field(
         default_factory=lambda: [
             EvaluationSetting(
@@ -119,32 +124,48 @@ def run_algorithm(
         if terminated or truncated:
             solution: Solution = info["solution"]
             energy_consumption: float = info.get("active_energy_consumption_j", 0)
-            start_time = min([assignment.start_time for assignment in solution.vm_assignments])
-            end_time = max([assignment.end_time for assignment in solution.vm_assignments])
-            makespan = end_time - start_time
+            vm_assignments = solution.vm_assignment_arrays()
+            makespan = float(vm_assignments["end_time"].max() - vm_assignments["start_time"].min())
             return makespan, energy_consumption, total_scheduling_time
 
 
-def main(args: Args):
-    random.seed(0)
-    np.random.seed(0)
-    torch.manual_seed(0)
+def evaluate(
+    seed_id: int, setting: EvaluationSetting, algorithm_name: str, algorithm: str, args: Args
+) -> dict[str, Any]:
+    # Seeded per evaluation, so results do not depend on evaluation order or on the worker that runs it
+    seed_everything(zlib.crc32(f"{seed_id}:{setting.id}:{algorithm}".encode()))
+    scheduler = algorithm_strategy.get_scheduler(algorithm)
+    makespan, energy_consumption, total_scheduling_time = run_algorithm(scheduler, seed_id, setting, args)
+    return {
+        "SeedId": seed_id,
+        "SettingId": setting.id,
+        "Algorithm": algorithm_name,
+        "Makespan": makespan,
+        "EnergyJ": energy_consumption,
+        "Time": total_scheduling_time,
+    }
+
+
+def seed_everything(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
 
-    all_eval_configs = itertools.product(range(args.num_samples_per_setting), args.settings, ALGORITHMS)
+
+def main(args: Args):
+    all_eval_configs = list(itertools.product(range(args.num_samples_per_setting), args.settings, ALGORITHMS))
     results: list[dict[str, Any]] = []
-    for seed_id, setting, (algorithm_name, algorithm) in tqdm(list(all_eval_configs)):
-        scheduler = algorithm_strategy.get_scheduler(algorithm)
-        makespan, energy_consumption, total_scheduling_time = run_algorithm(scheduler, seed_id, setting, args)
-        results.append(
-            {
-                "SeedId": seed_id,
-                "SettingId": setting.id,
-                "Algorithm": algorithm_name,
-                "Makespan": makespan,
-                "EnergyJ": energy_consumption,
-                "Time": total_scheduling_time,
-            }
-        )
+    if args.num_workers <= 1:
+        for seed_id, setting, (algorithm_name, algorithm) in tqdm(all_eval_configs):
+            results.append(evaluate(seed_id, setting, algorithm_name, algorithm, args))
+    else:
+        # Evaluations are independent and seeded, results are collected in the same order as the sequential run
+        with ProcessPoolExecutor(max_workers=args.num_workers) as executor:
+            futures = [
+                executor.submit(evaluate, seed_id, setting, algorithm_name, algorithm, args)
+                for seed_id, setting, (algorithm_name, algorithm) in all_eval_configs
+            ]
+            results.extend(future.result() for future in tqdm(futures))
 
     df = DataFrame(results)
     ic(df)
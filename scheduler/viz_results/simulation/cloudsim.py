@@ -3,8 +3,10 @@ import sys
 import time
 import socket
 import subprocess
+import threading
+from collections import deque
 
-from typing import Any, Callable
+from typing import Any, Callable, IO, NoReturn
 from py4j.java_gateway import JavaGateway, GatewayParameters
 
 from scheduler.dataset_generator.core.models import Dataset
@@ -35,6 +37,11 @@ class EmbeddedCloudSimSimulator:
     java_gateway: JavaGateway
     current_dataset: Dataset | None
 
+    start_timeout_s: float = 60.0
+    poll_interval_s: float = 0.05
+    max_output_lines: int = 10_000
+    max_error_lines: int = 20
+
     def __init__(
         self,
         simulator_jar_path: str,
@@ -43,6 +50,9 @@ class EmbeddedCloudSimSimulator:
     ):
         self.simulator_jar_path = simulator_jar_path
         self.simulator_process = None
+        self.output_readers: list[threading.Thread] = []
+        self.stdout_lines: deque[str] = deque(maxlen=self.max_output_lines)
+        self.stderr_lines: deque[str] = deque(maxlen=self.max_output_lines)
 
         gateway_params = GatewayParameters(port=free_port())
         self.java_gateway = JavaGateway(gateway_parameters=gateway_params)
@@ -73,17 +83,34 @@ class EmbeddedCloudSimSimulator:
         self.current_dataset = dataset
 
         assert self.simulator_process.stdin is not None
-        self.simulator_process.stdin.write(json.dumps(dataset.to_json()) + "\n")
-        self.simulator_process.stdin.flush()
+        try:
+            self.simulator_process.stdin.write(json.dumps(dataset.to_json()) + "\n")
+            self.simulator_process.stdin.flush()
+        except BrokenPipeError:
+            pass  # Simulator already exited, reported by the start wait below
         if self.remote_debug:
             # The first line is the JVM listening message
             assert self.simulator_process.stdout is not None
             print(self.simulator_process.stdout.readline())
 
-        # Wait for the simulator to start
-        time.sleep(0.1)
+        # Drain the outputs in the background so that the simulator never blocks on a full pipe
+        # (Only the last lines are kept)
+        self.stdout_lines = deque(maxlen=self.max_output_lines)
+        self.stderr_lines = deque(maxlen=self.max_output_lines)
+        self.output_readers = [
+            self._start_output_reader(self.simulator_process.stdout, self.stdout_lines),
+            self._start_output_reader(self.simulator_process.stderr, self.stderr_lines),
+        ]
+
+        # Wait for the simulator to start (fail if the process exits or does not start in time)
+        start_deadline = time.monotonic() + self.start_timeout_s
         while not self.is_running():
-            time.sleep(0.1)
+            return_code = self.simulator_process.poll()
+            if return_code is not None:
+                self._abort_start(f"Simulator exited with code {return_code} before starting")
+            if not self.remote_debug and time.monotonic() > start_deadline:
+                self._abort_start(f"Simulator did not start within {self.start_timeout_s} seconds")
+            time.sleep(self.poll_interval_s)
         self._print_if_verbose(f"Simulator started with PID: {self.simulator_process.pid} on port {port}")
 
     # Simulator Stop
@@ -99,15 +126,14 @@ class EmbeddedCloudSimSimulator:
         self.simulator_process.wait()
 
         # Wait for the simulator to stop
-        time.sleep(0.1)
         while self.is_running():
-            time.sleep(0.1)
+            time.sleep(self.poll_interval_s)
         self._print_if_verbose(f"Simulator stopped with PID: {self.simulator_process.pid}")
 
-        assert self.simulator_process.stdout is not None
-        assert self.simulator_process.stderr is not None
-        output = self.simulator_process.stdout.read()
-        self._print_if_verbose(self.simulator_process.stderr.read(), file=sys.stderr)
+        for output_reader in self.output_readers:
+            output_reader.join()
+        output = "".join(self.stdout_lines)
+        self._print_if_verbose("".join(self.stderr_lines), file=sys.stderr)
         self.simulator_process = None
         return output
 
@@ -162,6 +188,30 @@ class EmbeddedCloudSimSimulator:
         if res == 0:
             raise Exception(f"Port {port} is already in use")
 
+    def _abort_start(self, message: str) -> NoReturn:
+        """Terminate the simulator process that failed to start and raise with its last error lines."""
+        assert self.simulator_process is not None
+        self.simulator_process.terminate()
+        self.simulator_process.wait()
+        for output_reader in self.output_readers:
+            output_reader.join()
+        self.simulator_process = None
+
+        error_lines = list(self.stderr_lines)[-self.max_error_lines :]
+        raise Exception(f"{message}\nSimulator stderr (last {len(error_lines)} lines):\n{''.join(error_lines)}")
+
+    @staticmethod
+    def _start_output_reader(stream: IO[str] | None, lines: deque[str]) -> threading.Thread:
+        assert stream is not None
+
+        def read_lines():
+            for line in stream:
+                lines.append(line)
+
+        reader = threading.Thread(target=read_lines, daemon=True)
+        reader.start()
+        return reader
+
     def _print_if_verbose(self, *args, **kwargs):
         if self.verbose:
             print(*args, **kwargs)
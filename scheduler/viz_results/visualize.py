@@ -1,5 +1,4 @@
 import dataclasses
-import seaborn as sns
 import matplotlib.pyplot as plt
 import pandas as pd
 import tyro
@@ -15,14 +14,15 @@ class Args:
 
 
 def main(args: Args):
-    # Load data
-    df = pd.read_csv(args.import_csv)
-    avg_df = df.groupby(["SettingId", "Algorithm"], as_index=False).agg({"Makespan": "mean", "EnergyJ": "mean"})
+    # Load data (only the columns used in the plot)
+    df = pd.read_csv(args.import_csv, usecols=["SettingId", "Algorithm", "Makespan", "EnergyJ"])
 
-    # Reorder the data based on the provided order
+    # Averages are grouped by the ordered algorithm categories, so they come out in the provided order (no re-sorting)
     algorithm_order = [x[0] for x in ALGORITHMS]
-    avg_df["Algorithm"] = pd.Categorical(avg_df["Algorithm"], categories=algorithm_order, ordered=True)
-    avg_df = avg_df.sort_values("Algorithm")
+    df["Algorithm"] = pd.Categorical(df["Algorithm"], categories=algorithm_order, ordered=True)
+    avg_df = df.groupby(["Algorithm", "SettingId"], as_index=False, observed=True).agg(
+        {"Makespan": "mean", "EnergyJ": "mean"}
+    )
 
     # Initialize the plot
     fig, ax1 = plt.subplots(figsize=(6, 5))